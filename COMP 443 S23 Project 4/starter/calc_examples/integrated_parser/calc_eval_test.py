@@ -7,8 +7,15 @@ import sys
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 # import all node types from the calc language
+import calc_lang
 from calc_lang import *
 
+# numpy is optional and only needed to test Expression.eval_vectorized
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 class TestCalcEvaluation(unittest.TestCase):
     
     def test_number(self):
@@ -21,6 +28,21 @@ class TestCalcEvaluation(unittest.TestCase):
         with self.assertRaises(CalcEvalException):
             Name('DoesNotExist').eval()
     
+    def test_slots_on_first_set(self):
+        # names that are only parsed or looked up take up no slot
+        before: int = len(calc_lang._slots)
+        Name('NeverSet')
+        with self.assertRaises(CalcParseException):
+            Command.parse("set unused = + ( speculative ) ( 1")
+        with self.assertRaises(CalcEvalException):
+            Name('NeverSet').eval()
+        self.assertEqual(len(calc_lang._slots), before)
+        # a node made before its name was set still finds the value
+        early: Name = Name('setLater')
+        Set(Name('setLater'), Number(3)).eval()
+        self.assertEqual(len(calc_lang._slots), before + 1)
+        self.assertEqual(early.eval(), 3)
+
     def test_set_number(self):
         # make sure the set command updates the value of a variable
         var: Name = Name('myVar')
@@ -63,4 +85,75 @@ class TestCalcEvaluation(unittest.TestCase):
         Set(b, Subtract(Number(98), Number(62))).eval()
         self.assertEqual(Subtract(a,b).eval(), 29)
 
+    def test_constant_folding(self):
+        # constant subtrees should compile down to a single value
+        a: Expression = Subtract(Add(Number(5), Number(10)), Number(3))
+        self.assertEqual(a.compile(), [('PUSH', 12)])
+        b: Expression = Add(Name('unfolded'), Add(Number(1), Number(2)))
+        self.assertEqual(b.compile()[1:], [('PUSH', 3), ('ADD',)])
+
+    def test_folded_on_construction(self):
+        # constant subtrees are computed once when built, not on every eval
+        a: Expression = Subtract(Add(Number(5), Number(10)), Number(3))
+        self.assertEqual(a._value, 12)
+        self.assertEqual(a.eval(), 12)
+        # anything that reads a name is still evaluated each time
+        b: Expression = Add(Name('folded'), a)
+        self.assertIsNone(b._value)
+        Set(Name('folded'), Number(1)).eval()
+        self.assertEqual(b.eval(), 13)
+        Set(Name('folded'), Number(2)).eval()
+        self.assertEqual(b.eval(), 14)
+
+    def test_to_source(self):
+        # names are numbered in the order they are first read from ctx and
+        # constant subtrees are folded before the source is written
+        names: dict[str,int] = {}
+        a: Expression = Add(Name('src_x'), Subtract(Name('src_y'), Add(Number(1), Number(2))))
+        self.assertEqual(a.to_source(names), "(ctx[0] + (ctx[1] - 3))")
+        self.assertEqual(names, {'src_x': 0, 'src_y': 1})
+        b: Expression = Subtract(Name('src_x'), Name('src_x'))
+        self.assertEqual(b.to_source(), "(ctx[0] - ctx[0])")
+
+    def test_jit(self):
+        # a jitted expression reads the current values so later sets apply
+        x: Name = Name('jit_x')
+        fn = Add(x, Number(10)).jit()
+        Set(x, Number(5)).eval()
+        self.assertEqual(fn(), 15)
+        Set(x, Number(-20)).eval()
+        self.assertEqual(fn(), -10)
+
+    def test_jit_missing_name(self):
+        # make sure jitted expressions also report names that do not exist
+        fn = Add(Name('JitDoesNotExist'), Number(1)).jit()
+        with self.assertRaises(CalcEvalException):
+            fn()
+
+    @unittest.skipUnless(numpy, "eval_vectorized requires numpy")
+    def test_eval_vectorized(self):
+        # a column gives one result per row with the other names held fixed
+        Set(Name('vec_rate'), Number(3)).eval()
+        a: Expression = Subtract(Add(Name('vec_x'), Name('vec_rate')), Number(1))
+        result = a.eval_vectorized({'vec_x': [0, 10, -5, 2**40]})
+        self.assertEqual(result.tolist(), [2, 12, -3, 2**40 + 2])
+        # the rows must agree with evaluating each value in turn
+        for x, row in zip([0, 10, -5, 2**40], result.tolist()):
+            Set(Name('vec_x'), Number(x)).eval()
+            self.assertEqual(a.eval(), row)
+
+    @unittest.skipUnless(numpy, "eval_vectorized requires numpy")
+    def test_eval_vectorized_constant(self):
+        # an expression using none of the columns is broadcast to every row
+        a: Expression = Add(Number(4), Number(5))
+        result = a.eval_vectorized({'vec_unused': numpy.arange(3)})
+        self.assertEqual(result.tolist(), [9, 9, 9])
+
+    def test_deep_add(self):
+        # make sure trees deeper than the recursion limit still evaluate
+        a: Expression = Number(0)
+        for _ in range(5 * sys.getrecursionlimit()):
+            a = Add(Number(1), a)
+        self.assertEqual(a.eval(), 5 * sys.getrecursionlimit())
+
 if __name__=='__main__': unittest.main()
\ No newline at end of file
@@ -1,9 +1,29 @@
 from __future__ import annotations
 from abc import ABCMeta, abstractmethod
-from typing import Any, Union
+from functools import lru_cache
+import hashlib
+import sys
+from typing import Any, Callable, Optional, Union
 
-# create a context where variables stored with set are kept
-context: dict[str,int] = {}
+# numpy is optional and only needed by Expression.eval_vectorized
+try:
+    import numpy
+except ImportError:
+    numpy = None
+# numba is optional, without it expressions are jitted to Python functions
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# create a context where variables stored with set are kept, each name is
+# given a slot index once so lookups index a list instead of hashing names;
+# slots are only given out when a name is first set or compiled, so names
+# that are merely parsed take up none
+_name_to_slot: dict[str,int] = {}
+_slots: list[Any] = []
+# marks the slot of a name that has not been set yet
+_UNBOUND = object()
 
 # add a "verbose" flag to print all parse exceptions while debugging
 verbose = False
@@ -13,58 +33,270 @@ class CalcException(Exception): pass
 class CalcParseException(CalcException): pass
 class CalcEvalException(CalcException): pass
 
+# the grammar only allows ASCII digits and letters; isascii is a constant time
+# flag check that keeps unicode digits like '²' (which int rejects) out
+def _is_number(token: str) -> bool:
+    return token.isascii() and token.isdigit()
+def _is_name(token: str) -> bool:
+    return token.isascii() and token.isalpha()
+
+def _fail(message: str, tokens: Optional[list[str]] = None) -> None:
+    """Reports why a parse attempt did not match (if verbose) and returns None"""
+    # the tokens are only joined for printing so matches never pay for it
+    if verbose: print(message if tokens is None else f"{message} {' '.join(tokens)}")
+    return None
+
+def _try_parse_legacy(subclass: type[Command], tokens: list[str], i: int) -> Optional[tuple[Command, int]]:
+    """Parses tokens[i:] with a subclass that predates _try_parse or None"""
+    # subclasses written against the raising API define _parse_at, which
+    # already reports where the node ends
+    if '_parse_at' in vars(subclass):
+        try: return subclass._parse_at(tokens, i)
+        except CalcParseException as e: return _fail(str(e))
+    # a subclass that only defines parse must use up all the tokens it is
+    # given so offer it the longest slice first and shorten it until one fits
+    if 'parse' in vars(subclass):
+        for j in range(len(tokens), i, -1):
+            try: return subclass.parse(tokens[i:j]), j
+            except CalcParseException: pass
+        return _fail(f"Unrecognized {subclass.__name__}:", tokens[i:])
+    return None
+
+def _try_parse_operators(tokens: list[str], i: int) -> Optional[tuple[Expression, int]]:
+    """Parses the nested operator expressions at tokens[i] into (node, next index) or None"""
+    # operators nest as deeply as the input does, so rather than recursing for
+    # each operand the operators still waiting for their operands are kept on
+    # a stack of [operator class, first operand or None]
+    pending: list[list[Any]] = []
+    n: int = len(tokens)
+    while True:
+        # 1. every operator that begins here opens its first operand
+        t: Optional[str] = tokens[i] if i < n else None
+        op = _BINARY_OPERATORS.get(t)
+        if op is not None:
+            # ensure there are enough tokens for op ( first ) ( second )
+            if n - i < 7:
+                return _fail(f"Not enough tokens for {op.__name__} in:", tokens)
+            if tokens[i+1] != '(':
+                return _fail(f"{op.__name__} must begin with '{t} (' in", tokens)
+            pending.append([op, None])
+            i += 2
+            continue
+        # 2. anything else is an operand that contains no operator at its top
+        # (numbers and names, the common operands, skip the general parser)
+        if t is not None and _is_number(t): node, i = Number._shared(int(t)), i+1
+        elif t is not None and _is_name(t): node, i = Name._shared(t), i+1
+        else:
+            result = Expression._try_parse(tokens, i)
+            if result is None:
+                return _fail("Unable to parse operand in:", tokens)
+            node, i = result
+        # 3. close every operator whose second operand this completes
+        while pending:
+            frame = pending[-1]
+            op = frame[0]
+            if frame[1] is None:
+                # the first operand is closed and the second one opened
+                if n - i < 4:
+                    return _fail(f"Not enough tokens left for {op.__name__} in:", tokens)
+                if tokens[i] != ')' or tokens[i+1] != '(':
+                    return _fail(f"Operands of {op.__name__} must be wrapped in ( ):", tokens)
+                frame[1] = node
+                i += 2
+                break
+            # the second operand must be followed by a closing )
+            if i >= n or tokens[i] != ')':
+                return _fail(f"Operands of {op.__name__} must be wrapped in ( ):", tokens)
+            pending.pop()
+            node = op(frame[1], node)
+            i += 1
+        # once no operator is waiting the outermost one is complete
+        if not pending: return node, i
+
 # define a base class for Commands
 class Command(metaclass=ABCMeta):
+    # every node declares __slots__ so none of them carry a __dict__
+    __slots__ = ()
     @abstractmethod
     def __init__(self): pass
     @abstractmethod
     def eval(self) -> Union[int,None]: pass
+    # nodes are never modified after construction so repeated lines can
+    # share one parse tree (reset with Command.parse.cache_clear())
     @staticmethod
+    @lru_cache(maxsize=1024)
     def parse(s: str) -> Command:
         """Factory method for creating Command subclasses from lines of code"""
         # the command should split the input into tokens based on whitespace
-        tokens: list[str] = s.strip().split()
-        # a command must be either a statement or an expression
+        # (split already drops leading and trailing whitespace) and intern
+        # them so comparisons against '(' or 'set' succeed on identity
+        tokens: list[str] = [sys.intern(token) for token in s.split()]
+        if not tokens: raise CalcParseException("Empty Command")
+        # a command must be either a statement or an expression so first try
+        # to parse the command as a statement and if not, try an expression
         try:
-            # first try to parse the command as a statement
-            return Statement.parse(tokens)
-        except CalcParseException as e:
-            if verbose: print(e)
-        try:
-            # if it is not a statement, try an expression
-            return Expression.parse(tokens)
-        except CalcParseException as e:
-            if verbose: print(e)
+            for category in (Statement, Expression):
+                result = category._try_parse(tokens, 0)
+                if result is not None and result[1] == len(tokens): return result[0]
+        # operators are parsed without recursing, but a subclass's own parser
+        # may still recurse for each level it nests
+        except RecursionError:
+            raise CalcParseException(f"Command nested too deeply: {s[:40]}...")
         raise CalcParseException(f"Unrecognized Command: {s}")
 
 # define a base class for Expressions
 class Expression(Command, metaclass=ABCMeta):
+    __slots__ = ()
+    # the direct subclasses of Expression, recorded as they are defined
+    _subclasses: tuple[type[Expression], ...] = ()
+    # the number of operators on the longest path down from this node
+    _depth: int = 0
+    # the value of a subtree made only of constants, folded as it is built
+    _value: Optional[int] = None
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if Expression in cls.__bases__: Expression._subclasses += (cls,)
+    @staticmethod
+    def unregister(subclass: type[Expression]) -> None:
+        """Removes a subclass so that expressions are no longer parsed with it"""
+        Expression._subclasses = tuple(c for c in Expression._subclasses if c is not subclass)
+        # lines already parsed with the subclass must not be reused
+        Command.parse.cache_clear()
     @abstractmethod
     def __init__(self): pass
     @abstractmethod
     def eval(self) -> int: pass
+    def compile(self) -> list[tuple]:
+        """Flattens this expression into postfix instructions for Expression.run"""
+        code: list[tuple] = []
+        # walk the tree with an explicit stack so deep trees cannot overflow it
+        pending: list[Union[Expression, tuple]] = [self]
+        while pending:
+            item = pending.pop()
+            if not isinstance(item, tuple): pending.extend(item._postfix())
+            # an operator applied to two constants is folded into a constant
+            # so constant subtrees are only ever computed once
+            elif (item[0] in ('ADD', 'SUB') and len(code) >= 2 and
+                  code[-1][0] == 'PUSH' and code[-2][0] == 'PUSH'):
+                right: int = code.pop()[1]
+                left: int = code.pop()[1]
+                code.append(('PUSH', left + right if item[0] == 'ADD' else left - right))
+            else: code.append(item)
+        return code
+    def _postfix(self) -> list[Union[Expression, tuple]]:
+        """Returns this node's operands and instruction in reverse postfix order"""
+        # nodes without instructions of their own are evaluated directly
+        return [('EVAL', self)]
+    @staticmethod
+    def run(code: list[tuple], slots: Optional[list[Any]] = None) -> Any:
+        """Executes the postfix instructions from compile and returns the result"""
+        # variables are read from the context unless other slots are given
+        if slots is None: slots = _slots
+        stack: list[Any] = []
+        push = stack.append
+        pop = stack.pop
+        for op in code:
+            kind: str = op[0]
+            if kind == 'PUSH': push(op[1])
+            elif kind == 'LOAD':
+                value = slots[op[1]]
+                if value is _UNBOUND: raise CalcEvalException(f"{op[2]} is undefined")
+                push(value)
+            elif kind == 'ADD':
+                right = pop()
+                push(pop() + right)
+            elif kind == 'SUB':
+                right = pop()
+                push(pop() - right)
+            else: push(op[1].eval())
+        return pop()
+    def eval_vectorized(self, columns: dict[str, Any]) -> Any:
+        """Evaluates this expression over arrays of values for some of its names"""
+        # each name in columns is bound to an int64 array instead of a single
+        # value so one pass over the instructions evaluates every row at once
+        if numpy is None: raise CalcEvalException("eval_vectorized requires numpy")
+        # compiling first gives every name in this expression its slot
+        code: list[tuple] = self.compile()
+        slots: list[Any] = list(_slots)
+        shape: tuple[int, ...] = ()
+        for name, values in columns.items():
+            array = numpy.asarray(values, dtype=numpy.int64)
+            shape = numpy.broadcast_shapes(shape, array.shape)
+            if name in _name_to_slot: slots[_name_to_slot[name]] = array
+        # expressions that use none of the columns still give one value per row
+        return numpy.full(shape, 0, dtype=numpy.int64) + Expression.run(code, slots)
+    def to_source(self, names: Optional[dict[str,int]] = None) -> str:
+        """Writes this expression as Python source that reads names from ctx"""
+        # names maps each variable to the index of its value in ctx
+        if names is None: names = {}
+        parts: list[str] = []
+        for op in self.compile():
+            kind: str = op[0]
+            if kind == 'PUSH': parts.append(str(op[1]))
+            elif kind == 'LOAD':
+                parts.append(f"ctx[{names.setdefault(op[2], len(names))}]")
+            elif kind == 'ADD' or kind == 'SUB':
+                right = parts.pop()
+                parts.append(f"({parts.pop()} {'+' if kind == 'ADD' else '-'} {right})")
+            else:
+                raise CalcEvalException(f"{type(op[1]).__name__} has no source form")
+        return parts.pop()
+    def jit(self) -> Callable[[], int]:
+        """Compiles this expression to a function of the current context"""
+        # with numba the arithmetic is native int64 and may overflow where
+        # eval would not, so this is meant for re-evaluating hot expressions
+        names: dict[str,int] = {}
+        source: str = self.to_source(names)
+        key: str = hashlib.sha1(source.encode()).hexdigest()
+        fn = _JIT_CACHE.get(key)
+        if fn is None:
+            fn = eval(f"lambda ctx: {source}", {})
+            if numba is not None: fn = numba.njit(fn)
+            _JIT_CACHE[key] = fn
+        order: list[str] = list(names)
+        slots: list[int] = [_name_to_slot[name] for name in order]
+        def evaluate() -> int:
+            ctx: list[Any] = [_slots[slot] for slot in slots]
+            if _UNBOUND in ctx:
+                raise CalcEvalException(f"{order[ctx.index(_UNBOUND)]} is undefined")
+            if numba is not None: return int(fn(numpy.array(ctx, dtype=numpy.int64)))
+            return fn(ctx)
+        return evaluate
     @classmethod
     def parse(cls, tokens: list[str]) -> Expression:
         """Factory method for creating Expression subclasses from tokens"""
-        # get a list of all the subclasses of Expression
-        subclasses: list[type[Expression]] = cls.__subclasses__()
-        # try each subclass in turn to see if it matches the pattern
-        for subclass in subclasses:
-            try: 
-                return subclass.parse(tokens)
-            except CalcParseException as e:
-                if verbose: print(e)
-        # if none of the subclasses parsed successfully raise an exception
-        raise CalcParseException(f"Unrecognized Expression: {' '.join(tokens)}")
+        result = cls._try_parse(tokens, 0)
+        # the expression must use up every one of the tokens
+        if result is None or result[1] != len(tokens):
+            raise CalcParseException(f"Unrecognized {cls.__name__}: {' '.join(tokens)}")
+        return result[0]
+    @classmethod
+    def _try_parse(cls, tokens: list[str], i: int) -> Optional[tuple[Expression, int]]:
+        """Parses the expression at tokens[i] into (node, next index) or None"""
+        if i >= len(tokens): return _fail("Missing Expression")
+        # the first token determines which subclass could match the pattern
+        t0: str = tokens[i]
+        if t0 in _EXPR_DISPATCH: return _EXPR_DISPATCH[t0](tokens, i)
+        if _is_number(t0): return Number._shared(int(t0)), i+1
+        if _is_name(t0): return Name._shared(t0), i+1
+        # try any subclasses defined beyond the built in ones in turn
+        for subclass in Expression._subclasses:
+            if subclass in _EXPR_BUILTINS: continue
+            result = (subclass._try_parse(tokens, i) if '_try_parse' in vars(subclass)
+                      else _try_parse_legacy(subclass, tokens, i))
+            if result is not None: return result
+        # if none of the subclasses parsed successfully report the failure
+        return _fail("Unrecognized Expression:", tokens)
     @staticmethod
-    def match_parens(tokens: list[str]) -> int:
-        """Searches tokens beginning with ( and returns index of matching )"""
+    def match_parens(tokens: list[str], start: int = 0) -> int:
+        """Searches tokens from the ( at start and returns index of matching )"""
         # ensure tokens is such that a matching ) might exist
-        if len(tokens) < 2: raise CalcParseException("Expression too short")
-        if tokens[0] != '(': raise CalcParseException("No opening ( found")
+        if len(tokens) - start < 2: raise CalcParseException("Expression too short")
+        if tokens[start] != '(': raise CalcParseException("No opening ( found")
         # track the depth of nested ()
         depth: int = 0
-        for i,token in enumerate(tokens):
+        for i in range(start, len(tokens)):
+            token: str = tokens[i]
             # when a ( is found, increase the depth
             if token == '(': depth += 1
             # when a ) is found, decrease the depth
@@ -76,176 +308,253 @@ class Expression(Command, metaclass=ABCMeta):
 
 # define a base class for Statements
 class Statement(Command, metaclass=ABCMeta):
+    __slots__ = ()
+    # the direct subclasses of Statement, recorded as they are defined
+    _subclasses: tuple[type[Statement], ...] = ()
+    # the token a subclass's statements begin with, or None if they have none
+    keyword: Optional[str] = None
+    # the keywords of every subclass, or None while one of them has none
+    _keywords: Optional[frozenset[str]] = frozenset()
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if Statement not in cls.__bases__: return
+        Statement._subclasses += (cls,)
+        Statement._update_keywords()
+    @staticmethod
+    def unregister(subclass: type[Statement]) -> None:
+        """Removes a subclass so that statements are no longer parsed with it"""
+        Statement._subclasses = tuple(c for c in Statement._subclasses if c is not subclass)
+        Statement._update_keywords()
+        # lines already parsed with the subclass must not be reused
+        Command.parse.cache_clear()
+    @staticmethod
+    def _update_keywords() -> None:
+        keywords: list[Optional[str]] = [c.keyword for c in Statement._subclasses]
+        Statement._keywords = None if None in keywords else frozenset(keywords)
     @abstractmethod
     def __init__(self): pass
     @abstractmethod
     def eval(self) -> None: pass
-    @staticmethod
-    def parse(tokens: list[str]) -> Statement:
+    @classmethod
+    def parse(cls, tokens: list[str]) -> Statement:
         """Factory method for creating Statement subclasses from tokens"""
-        # the only valid statement in our language is set so try that
-        stmt: Statement = Set.parse(tokens)
-        return stmt
+        result = cls._try_parse(tokens, 0)
+        # the statement must use up every one of the tokens
+        if result is None or result[1] != len(tokens):
+            raise CalcParseException(f"Unrecognized {cls.__name__}: {' '.join(tokens)}")
+        return result[0]
+    @classmethod
+    def _try_parse(cls, tokens: list[str], i: int) -> Optional[tuple[Statement, int]]:
+        """Parses the statement at tokens[i] into (node, next index) or None"""
+        # when every statement begins with a keyword anything else is rejected
+        # without trying any of the subclasses
+        keywords = Statement._keywords
+        if i >= len(tokens) or (keywords is not None and tokens[i] not in keywords):
+            return _fail("Statements must begin with a statement keyword")
+        # try each subclass in turn to see if it matches the pattern; one
+        # that inherits this method would only call back into this loop
+        for subclass in Statement._subclasses:
+            result = (subclass._try_parse(tokens, i) if '_try_parse' in vars(subclass)
+                      else _try_parse_legacy(subclass, tokens, i))
+            if result is not None: return result
+        return None
 
 # define a class to represent the "set" statement
 class Set(Statement):
+    __slots__ = ('name', 'value')
+    keyword = 'set'
     def __init__(self, name: Name, value: Expression):
         self.name = name
         self.value = value
     def eval(self) -> None:
-        context[self.name.name] = self.value.eval()
+        _slots[self.name.slot] = self.value.eval()
     def __eq__(self, other: Any):
         return (isinstance(other, Set) and 
                 self.name == other.name and 
                 self.value == other.value)
-    @staticmethod
-    def parse(tokens: list[str]) -> Set:
-        """Factory method for creating Set commands from tokens"""
+    @classmethod
+    def _try_parse(cls, tokens: list[str], i: int) -> Optional[tuple[Set, int]]:
+        """Parses the Set statement at tokens[i] into (node, next index) or None"""
         # check to see if this string matches the pattern for set
         # 0. ensure there are enough tokens for this to be a set statement
-        if len(tokens) < 4:
-            raise CalcParseException("Statement too short for Set")
-        # 1. ensure that the very first token is "set" otherwise throw Exception
-        if tokens[0] != 'set': 
-            raise CalcParseException("Set statements must begin with 'set'")
+        if len(tokens) - i < 4:
+            return _fail("Statement too short for Set")
+        # 1. ensure that the very first token is "set" otherwise it is not a Set
+        if tokens[i] != 'set':
+            return _fail("Set statements must begin with 'set'")
         # 2. ensure that the next token is a valid Name
-        try:
-            name: Name = Name.parse([tokens[1]])
-        except CalcParseException:
-            raise CalcParseException("No name found for Set statement")
+        name = Name._try_parse(tokens, i+1)
+        if name is None:
+            return _fail("No name found for Set statement")
         # 3. ensure that the next token is an '='
-        if tokens[2] != '=':
-            raise CalcParseException("Set statement requires '='")
+        if tokens[i+2] != '=':
+            return _fail("Set statement requires '='")
         # 4. ensure the remaining tokens represent an expression
-        try:
-            value: Expression = Expression.parse(tokens[3:])
-        except CalcParseException:
-            raise CalcParseException("No value found for Set statement")
+        value = Expression._try_parse(tokens, i+3)
+        if value is None:
+            return _fail("No value found for Set statement")
         # if this point is reached, this is a valid Set statement
-        return Set(name, value)
+        return Set(name[0], value[0]), value[1]
 
 # define an expression for the addition operation
 class Add(Expression):
+    __slots__ = ('first', 'second', '_depth', '_code', '_value')
     def __init__(self, first: Expression, second: Expression):
         self.first = first
         self.second = second
+        depth: int = first._depth
+        self._depth = 1 + (depth if depth > second._depth else second._depth)
+        self._code: Optional[list[tuple]] = None
+        # operands that are both constant are computed now instead of on every eval
+        left, right = first._value, second._value
+        self._value = None if left is None or right is None else left + right
     def eval(self) -> int:
-        return self.first.eval() + self.second.eval()
+        if self._value is not None: return self._value
+        # recursion is fastest, so only trees too deep to recurse through are
+        # compiled (once, on their first evaluation) and run on a stack
+        if self._depth < _RECURSION_DEPTH: return self.first.eval() + self.second.eval()
+        if self._code is None: self._code = self.compile()
+        return Expression.run(self._code)
+    def _postfix(self) -> list[Union[Expression, tuple]]:
+        return [('ADD',), self.second, self.first]
     def __eq__(self, other) -> bool:
         return (isinstance(other, Add) and 
                 other.first == self.first and 
                 other.second == self.second)
-    @staticmethod
-    def parse(tokens: list[str]) -> Add:
-        """Factory method for creating Add expressions from tokens"""
-        s = ' '.join(tokens)
-        # check to see if this string matches the pattern for add
-        # 0. ensure there are enough tokens for this to be a add expression
-        if len(tokens) < 7:
-            raise CalcParseException(f"Not enough tokens for Add in: {s}")
-        # 1. ensure the first two tokens are + and (
-        if tokens[0] != '+' or tokens[1] != '(':
-            raise CalcParseException(f"Add must begin with '+ (' in {s}")
-        # 2. ensure there is an expression inside that open parentheses
-        try:
-            cut = Expression.match_parens(tokens[1:])+1
-            first: Expression = Expression.parse(tokens[2:cut])
-        except CalcParseException:
-            raise CalcParseException(f"Unable to parse first addend in: {s}")
-        # 3. ensure there are enough tokens left after the first expression
-        tokens = tokens[cut+1:]
-        if len(tokens) < 3:
-            raise CalcParseException(f"Not enough tokens left for Add in: {s}")
-        # 4. ensure the first and last of the remaining tokens are ( and )
-        if tokens[0] != '(' or tokens[-1] != ')':
-            raise CalcParseException(f"Addends must be wrapped in ( ): {s}")
-        # 5. ensure the tokens between these are a valid expression
-        try:
-            second: Expression = Expression.parse(tokens[1:-1])
-        except CalcParseException:
-            raise CalcParseException(f"Unable to parse second addend in: {s}")
-        # if this point is reached, this is a valid Add expression
-        return Add(first, second)
+    @classmethod
+    def _try_parse(cls, tokens: list[str], i: int) -> Optional[tuple[Add, int]]:
+        """Parses the Add expression at tokens[i] into (node, next index) or None"""
+        # ensure the first token is + otherwise it is not an Add
+        if i >= len(tokens) or tokens[i] != '+':
+            return _fail("Add must begin with '+ (' in", tokens)
+        return _try_parse_operators(tokens, i)
 
 # define an expression for the subtraction operation
 class Subtract(Expression):
+    __slots__ = ('first', 'second', '_depth', '_code', '_value')
     def __init__(self, first: Expression, second: Expression):
         self.first = first
         self.second = second
+        depth: int = first._depth
+        self._depth = 1 + (depth if depth > second._depth else second._depth)
+        self._code: Optional[list[tuple]] = None
+        # operands that are both constant are computed now instead of on every eval
+        left, right = first._value, second._value
+        self._value = None if left is None or right is None else left - right
     def eval(self) -> int:
-        return self.first.eval() - self.second.eval()
+        if self._value is not None: return self._value
+        # recursion is fastest, so only trees too deep to recurse through are
+        # compiled (once, on their first evaluation) and run on a stack
+        if self._depth < _RECURSION_DEPTH: return self.first.eval() - self.second.eval()
+        if self._code is None: self._code = self.compile()
+        return Expression.run(self._code)
+    def _postfix(self) -> list[Union[Expression, tuple]]:
+        return [('SUB',), self.second, self.first]
     def __eq__(self, other) -> bool:
         return (isinstance(other, Subtract) and 
                 other.first == self.first and 
                 other.second == self.second)
-    @staticmethod
-    def parse(tokens: list[str]) -> Subtract:
-        """Factory method for creating Subtract expressions from tokens"""
-        # check to see if this string matches the pattern for subtract
-        # 0. ensure there are enough tokens for this to be a subtract expression
-        if len(tokens) < 7:
-            raise CalcParseException("Not enough tokens for Subtract")
-        # 1. ensure the first two tokens are - and (
-        if tokens[0] != '-' or tokens[1] != '(':
-            raise CalcParseException("Subtract must begin with - (")
-        # 2. ensure there is an expression inside that open parentheses
-        try:
-            cut = Expression.match_parens(tokens[1:])+1
-            first: Expression = Expression.parse(tokens[2:cut])
-        except CalcParseException:
-            raise CalcParseException("Unable to parse minuend")
-        # 3. ensure there are enough tokens left after the first expression
-        tokens = tokens[cut+1:]
-        if len(tokens) < 3:
-            raise CalcParseException("Not enough tokens left for Subtract")
-        # 4. ensure the first and last of the remaining tokens are ( and )
-        if tokens[0] != '(' or tokens[-1] != ')':
-            raise CalcParseException("Subtrahends must be wrapped in ( )")
-        # 5. ensure the tokens between these are a valid expression
-        try:
-            second: Expression = Expression.parse(tokens[1:-1])
-        except CalcParseException:
-            raise CalcParseException("Unable to parse subtrahend")
-        # if this point is reached, this is a valid Add expression
-        return Subtract(first, second)
+    @classmethod
+    def _try_parse(cls, tokens: list[str], i: int) -> Optional[tuple[Subtract, int]]:
+        """Parses the Subtract expression at tokens[i] into (node, next index) or None"""
+        # ensure the first token is - otherwise it is not a Subtract
+        if i >= len(tokens) or tokens[i] != '-':
+            return _fail("Subtract must begin with - (")
+        return _try_parse_operators(tokens, i)
 
 # define an expression for an integer constant
 class Number(Expression):
+    __slots__ = ('num', '_value')
     def __init__(self, num: int):
         self.num = num
+        self._value: Optional[int] = num
     def eval(self) -> int:
         return self.num
+    def _postfix(self) -> list[Union[Expression, tuple]]:
+        return [('PUSH', self.num)]
     def __eq__(self, other: Any) -> bool:
         return (isinstance(other, Number) and other.num == self.num)
     @staticmethod
-    def parse(tokens: list[str]) -> Number:
-        """Factory method for creating Number expressions from tokens"""
-        # 0. ensure there is exactly one token
-        if len(tokens) != 1:
-            raise CalcParseException("Wrong number of tokens for Number")
+    def _shared(num: int) -> Number:
+        """Returns the single Number node the parser uses for a small num"""
+        if not -128 <= num <= 256: return Number(num)
+        node = _NUM_CACHE.get(num)
+        if node is None: node = _NUM_CACHE[num] = Number(num)
+        return node
+    @classmethod
+    def _try_parse(cls, tokens: list[str], i: int) -> Optional[tuple[Number, int]]:
+        """Parses the Number expression at tokens[i] into (node, next index) or None"""
+        # 0. ensure there is a token left to parse
+        if i >= len(tokens):
+            return _fail("No token left for Number")
         # 1. ensure that all characters in that token are digits
-        if not tokens[0].isdigit():
-            raise CalcParseException("Numbers can only contain digits")
+        if not _is_number(tokens[i]):
+            return _fail("Numbers can only contain digits")
         # if this point is reached, this is a valid Number expression
-        return Number(int(tokens[0]))
+        return Number._shared(int(tokens[i])), i+1
 
 # define an expression for a variable name
 class Name(Expression):
+    __slots__ = ('name', '_slot')
     def __init__(self, name: str):
         self.name = name
+        self._slot: Optional[int] = None
+    @property
+    def slot(self) -> int:
+        """The index of this name's value in _slots, given out on first use"""
+        if self._slot is None:
+            # find the slot for this name, adding an unbound one if it is new
+            self._slot = _name_to_slot.setdefault(self.name, len(_slots))
+            if self._slot == len(_slots): _slots.append(_UNBOUND)
+        return self._slot
     def eval(self) -> int:
-        try: return context[self.name]
-        except KeyError: raise CalcEvalException(f"{self.name} is undefined")
+        slot = self._slot
+        if slot is None:
+            # a name that has no slot yet has never been set
+            slot = _name_to_slot.get(self.name)
+            if slot is None: raise CalcEvalException(f"{self.name} is undefined")
+            self._slot = slot
+        value = _slots[slot]
+        if value is _UNBOUND: raise CalcEvalException(f"{self.name} is undefined")
+        return value
+    def _postfix(self) -> list[Union[Expression, tuple]]:
+        return [('LOAD', self.slot, self.name)]
     def __eq__(self, other: Any) -> bool:
         return isinstance(other, Name) and other.name == self.name
     @staticmethod
-    def parse(tokens: list[str]) -> Name:
-        """Factory method for creating Name expressions from tokens"""
-        # 0. ensure there is exactly one token
-        if len(tokens) != 1:
-            raise CalcParseException("Wrong number of tokens for Name")
+    def _shared(name: str) -> Name:
+        """Returns the single Name node the parser uses for name"""
+        return _NAME_CACHE(name)
+    @classmethod
+    def _try_parse(cls, tokens: list[str], i: int) -> Optional[tuple[Name, int]]:
+        """Parses the Name expression at tokens[i] into (node, next index) or None"""
+        # 0. ensure there is a token left to parse
+        if i >= len(tokens):
+            return _fail("No token left for Name")
         # 1. ensure that all characters in that token are alphabetic
-        if not tokens[0].isalpha():
-            raise CalcParseException("Names can only contain letters")
-        # if this point is reached, this is a valid Number expression
-        return Name(tokens[0])
+        if not _is_name(tokens[i]):
+            return _fail("Names can only contain letters")
+        # if this point is reached, this is a valid Name expression
+        return Name._shared(tokens[i]), i+1
+
+# operator trees at least this deep are evaluated with Expression.run so that
+# eval never nests more than this many calls
+_RECURSION_DEPTH: int = 100
+
+# leaf nodes hold no state beyond their token so parsed ones are shared;
+# a program can use any number of distinct names, so only the most recently
+# parsed ones are kept
+_NUM_CACHE: dict[int, Number] = {}
+_NAME_CACHE: Callable[[str], Name] = lru_cache(maxsize=1024)(Name)
+
+# jitted functions keyed by the sha1 of their source so equal trees share one
+_JIT_CACHE: dict[str, Callable] = {}
+
+# the operator expressions that _try_parse_operators builds, by their token
+_BINARY_OPERATORS: dict[str, type[Expression]] = {'+': Add, '-': Subtract}
+# map the first token of an operator expression directly to its parser
+_EXPR_DISPATCH: dict[str, Callable[[list[str], int], Optional[tuple[Expression, int]]]] = {
+    token: op._try_parse for token, op in _BINARY_OPERATORS.items()
+}
+# the subclasses handled without trying each one in turn
+_EXPR_BUILTINS: tuple[type[Expression], ...] = (Add, Subtract, Number, Name)
@@ -7,6 +7,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 # import all node types from the calc language
+import calc_lang
 from calc_lang import *
 
 class TestCalcParsing(unittest.TestCase):
@@ -19,6 +20,13 @@ class TestCalcParsing(unittest.TestCase):
         cmd: Command = Command.parse("hello")
         self.assertEqual(cmd, Name("hello"))
     
+    def test_non_ascii(self):
+        # only ascii digits and letters are valid numbers and names
+        with self.assertRaises(CalcParseException):
+            Command.parse("\u00b2")
+        with self.assertRaises(CalcParseException):
+            Command.parse("caf\u00e9")
+    
     def test_simple_set(self):
         cmd: Command = Command.parse("set hello = 64")
         self.assertEqual(cmd, Set(Name("hello"), Number(64)))
@@ -52,6 +60,110 @@ class TestCalcParsing(unittest.TestCase):
     def test_complex_set(self):
         cmd: Command = Command.parse("set x = + ( + ( 1 ) ( 2 ) ) ( hello )")
         self.assertEqual(cmd, Set(Name("x"), Add(Add(Number(1),Number(2)),Name("hello"))))
+
+    def test_deep_nesting(self):
+        # operators nested far beyond the recursion limit still parse
+        depth: int = 5 * sys.getrecursionlimit()
+        line: str = "1"
+        for _ in range(depth):
+            line = f"- ( + ( {line} ) ( 2 ) ) ( 1 )"
+        cmd: Command = Command.parse(f"set deep = {line}")
+        self.assertIsInstance(cmd, Set)
+        cmd.eval()
+        self.assertEqual(Name("deep").eval(), 1 + depth)
+        # and a mistake at the innermost level is still a parse error
+        with self.assertRaises(CalcParseException):
+            Command.parse(line.replace("( 1 )", "( 1", 1))
+
+    def test_statement_without_try_parse(self):
+        # a statement subclass that inherits _try_parse must not make
+        # malformed statements recurse back into Statement._try_parse
+        class Reject(Statement):
+            __slots__ = ()
+            def __init__(self): pass
+            def eval(self) -> None: pass
+            @staticmethod
+            def parse(tokens: list[str]) -> Statement:
+                raise CalcParseException("Reject never parses")
+        self.addCleanup(Statement.unregister, Reject)
+        for line in ("set x =", "set x = + ( 1 )"):
+            with self.assertRaises(CalcParseException):
+                Command.parse(line)
+        # removing it restores the keyword check it had switched off
+        self.assertIsNone(Statement._keywords)
+        Statement.unregister(Reject)
+        self.assertEqual(Statement._subclasses, (Set,))
+        self.assertEqual(Statement._keywords, frozenset({'set'}))
+
+    def test_parse_only_expression(self):
+        # an expression subclass that only defines parse (the API before
+        # _try_parse) is still found, including inside other expressions
+        class Negate(Expression):
+            __slots__ = ('value',)
+            def __init__(self, value: Expression): self.value = value
+            def eval(self) -> int: return -self.value.eval()
+            def __eq__(self, other: Any):
+                return isinstance(other, Negate) and self.value == other.value
+            @staticmethod
+            def parse(tokens: list[str]) -> Negate:
+                if len(tokens) != 2 or tokens[0] != '~':
+                    raise CalcParseException("Not a Negate")
+                return Negate(Expression.parse(tokens[1:]))
+        self.addCleanup(Expression.unregister, Negate)
+        self.assertEqual(Command.parse("~ 3"), Negate(Number(3)))
+        cmd: Command = Command.parse("+ ( ~ 3 ) ( 1 )")
+        self.assertEqual(cmd, Add(Negate(Number(3)), Number(1)))
+        with self.assertRaises(CalcParseException):
+            Command.parse("~")
+        # once it is removed its expressions no longer parse
+        Expression.unregister(Negate)
+        self.assertEqual(Expression._subclasses, (Add, Subtract, Number, Name))
+        with self.assertRaises(CalcParseException):
+            Command.parse("~ 3")
+
+    def test_statement_keyword(self):
+        # a statement subclass's keyword lets its statements past the
+        # check that rejects anything not starting with a keyword
+        class Show(Statement):
+            __slots__ = ('value',)
+            keyword = 'show'
+            def __init__(self, value: Expression): self.value = value
+            def eval(self) -> None: pass
+            @classmethod
+            def _try_parse(cls, tokens: list[str], i: int):
+                if tokens[i] != 'show': return None
+                value = Expression._try_parse(tokens, i+1)
+                if value is None: return None
+                return Show(value[0]), value[1]
+        self.addCleanup(Statement.unregister, Show)
+        cmd = Command.parse("show x")
+        self.assertIsInstance(cmd, Show)
+        self.assertEqual(cmd.value, Name("x"))
+        # once it is removed its keyword and statements are gone again
+        Statement.unregister(Show)
+        self.assertEqual(Statement._keywords, frozenset({'set'}))
+        with self.assertRaises(CalcParseException):
+            Command.parse("show x")
+
+    def test_cached_parse(self):
+        # parsing the same line twice should reuse the same node
+        cmd: Command = Command.parse("+ ( 42 ) ( 64 )")
+        self.assertIs(Command.parse("+ ( 42 ) ( 64 )"), cmd)
+        # clearing the cache should produce a fresh but equal node
+        Command.parse.cache_clear()
+        self.assertIsNot(Command.parse("+ ( 42 ) ( 64 )"), cmd)
+        self.assertEqual(Command.parse("+ ( 42 ) ( 64 )"), cmd)
+
+    def test_shared_leaves(self):
+        # small numbers and recent names parse to one shared node each
+        self.assertIs(Expression.parse(["7"]), Expression.parse(["7"]))
+        self.assertIs(Expression.parse(["shared"]), Expression.parse(["shared"]))
+        # but the caches keep a bounded number of them
+        self.assertIsNot(Expression.parse(["100000"]), Expression.parse(["100000"]))
+        for k in range(2000):
+            Expression.parse(["shared" + "".join(chr(97 + int(d)) for d in str(k))])
+        self.assertLessEqual(len(calc_lang._NUM_CACHE), 385)
+        self.assertLessEqual(calc_lang._NAME_CACHE.cache_info().currsize, 1024)
         
 
 if __name__=='__main__': unittest.main()
\ No newline at end of file
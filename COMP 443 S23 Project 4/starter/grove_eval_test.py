@@ -0,0 +1,102 @@
+from __future__ import annotations
+import unittest
+
+# identify the current directory of this script and add it to the path
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+# import all node types from the grove language
+import collections
+from grove_lang import *
+
+class TestGroveEvaluation(unittest.TestCase):
+
+    def test_set_and_read_name(self):
+        # a name evaluates to the value that was set, not a (value, type) pair
+        Command.parse("set x = 5").eval()
+        self.assertEqual(Command.parse("x").eval(), 5)
+        Command.parse('set x = "five"').eval()
+        self.assertEqual(Command.parse("x").eval(), '"five"')
+
+    def test_missing_name(self):
+        with self.assertRaises(GroveEvalException):
+            Command.parse("DoesNotExist").eval()
+
+    def test_import_twice(self):
+        # importing a module that is already in the context again still works
+        Command.parse("import os").eval()
+        Command.parse("import os").eval()
+        self.assertIs(context["os"], os)
+
+    def test_import_dotted(self):
+        Command.parse("import os . path").eval()
+        self.assertIs(context["os.path"], os.path)
+
+    def test_import_missing(self):
+        with self.assertRaises(GroveEvalException):
+            Command.parse("import no_such_module_here").eval()
+
+    def test_new_imported(self):
+        Command.parse("import collections").eval()
+        obj = Command.parse("new collections.OrderedDict").eval()
+        self.assertIsInstance(obj, collections.OrderedDict)
+
+    def test_new_builtin(self):
+        obj = Command.parse("new __builtins__.list").eval()
+        self.assertEqual(obj, [])
+
+    def test_new_errors(self):
+        Command.parse("import collections").eval()
+        # a path that is missing an attribute, or that does not name a
+        # type, says so using the whole dotted path
+        with self.assertRaisesRegex(GroveEvalException, "collections.NoSuchType has not been imported yet"):
+            Command.parse("new collections.NoSuchType").eval()
+        with self.assertRaisesRegex(GroveEvalException, "collections.abc is not a type"):
+            Command.parse("new collections.abc").eval()
+        with self.assertRaisesRegex(GroveEvalException, "notImported has not been imported yet"):
+            Command.parse("new notImported.Thing").eval()
+
+    def test_call_literal_args(self):
+        # literal arguments are evaluated once, when the node is built
+        Command.parse("set lits = new __builtins__.list").eval()
+        call: Call = Command.parse("call ( lits append 5 )")
+        self.assertEqual(call._const_values, (5,))
+        call.eval()
+        call.eval()
+        self.assertEqual(context["lits"], [5, 5])
+
+    def test_call_name_args(self):
+        # arguments that read names are evaluated on every call
+        Command.parse("set names = new __builtins__.list").eval()
+        call: Call = Command.parse("call ( names append n )")
+        self.assertIsNone(call._const_values)
+        Command.parse("set n = 3").eval()
+        call.eval()
+        Command.parse("set n = 4").eval()
+        call.eval()
+        self.assertEqual(context["names"], [3, 4])
+
+    def test_call_missing_object(self):
+        with self.assertRaisesRegex(GroveEvalException, "Specified object nobody does not exist"):
+            Command.parse("call ( nobody upper )").eval()
+
+    def test_call_not_callable(self):
+        Command.parse("import os").eval()
+        with self.assertRaisesRegex(GroveEvalException, "attribute sep is not callable"):
+            Command.parse("call ( os sep )").eval()
+
+    def test_call_rebound_object(self):
+        # the bound method is only reused while the name holds the same object
+        Command.parse("set rebound = new __builtins__.list").eval()
+        Command.parse("call ( rebound append 1 )").eval()
+        call: Call = Command.parse("call ( rebound __len__ )")
+        self.assertEqual(call.eval(), 1)
+        Command.parse("set rebound = new __builtins__.list").eval()
+        self.assertEqual(call.eval(), 0)
+        # a different type of object is looked up afresh
+        Command.parse("import collections").eval()
+        Command.parse("set rebound = new collections.OrderedDict").eval()
+        self.assertEqual(call.eval(), 0)
+
+if __name__=='__main__': unittest.main()
@@ -1,15 +1,68 @@
 from __future__ import annotations
 from abc import ABCMeta, abstractmethod
-from typing import Any, Union
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, ClassVar, Sequence, Union
 ## Parse tree nodes for the Calc language
 import re
 import sys
 import importlib
 import builtins
+from operator import attrgetter
 
 context: dict[str,object] = {}
 verbose = False
-protected_names = ["set", "call", "new", "quit", "exit", "import"]
+protected_names = frozenset(("set", "call", "new", "quit", "exit", "import", "="))
+# classifies a whole token in one match; lastgroup names its kind
+_TOKEN_RE = re.compile(r'(?P<STR>"[^"\s]*")|(?P<NUM>\d+)|(?P<NAME>[A-Za-z_]\w*)|(?P<PUNCT>[().=+])', re.ASCII)
+
+def token_kind(token: str) -> Union[str, None]:
+    """Returns STR, NUM, NAME or PUNCT for a valid token, otherwise None"""
+    match = _TOKEN_RE.fullmatch(token)
+    return match.lastgroup if match else None
+
+# first-token dispatch tables and the (priority, class) pairs of registered
+# subclasses without a keyword, filled in by the register decorators
+_EXPR_DISPATCH: dict[str, type[Expression]] = {}
+_STMT_DISPATCH: dict[str, type[Statement]] = {}
+_expr_subs: list[tuple[int, type[Expression]]] = []
+_stmt_subs: list[tuple[int, type[Statement]]] = []
+
+def register_expression(priority: int = 0, keywords: tuple[str, ...] = ()) -> Callable[[type], type]:
+    """Class decorator making an Expression subclass known to Expression.parse"""
+    def register(cls: type) -> type:
+        for keyword in keywords: _EXPR_DISPATCH[keyword] = cls
+        if not keywords:
+            _expr_subs.append((priority, cls))
+            Expression._ordered = _by_priority(_expr_subs)
+        return cls
+    return register
+
+def register_statement(priority: int = 0, keywords: tuple[str, ...] = ()) -> Callable[[type], type]:
+    """Class decorator making a Statement subclass known to Statement.parse"""
+    def register(cls: type) -> type:
+        for keyword in keywords: _STMT_DISPATCH[keyword] = cls
+        if not keywords:
+            _stmt_subs.append((priority, cls))
+            Statement._ordered = _by_priority(_stmt_subs)
+        return cls
+    return register
+
+def unregister_expression(cls: type) -> None:
+    """Makes an Expression subclass unknown to Expression.parse again"""
+    for keyword in [k for k, c in _EXPR_DISPATCH.items() if c is cls]: del _EXPR_DISPATCH[keyword]
+    _expr_subs[:] = [sub for sub in _expr_subs if sub[1] is not cls]
+    Expression._ordered = _by_priority(_expr_subs)
+
+def unregister_statement(cls: type) -> None:
+    """Makes a Statement subclass unknown to Statement.parse again"""
+    for keyword in [k for k, c in _STMT_DISPATCH.items() if c is cls]: del _STMT_DISPATCH[keyword]
+    _stmt_subs[:] = [sub for sub in _stmt_subs if sub[1] is not cls]
+    Statement._ordered = _by_priority(_stmt_subs)
+
+def _by_priority(subs: list[tuple[int, Any]]) -> tuple[Any, ...]:
+    """Orders registered classes from highest to lowest priority"""
+    return tuple(c for _, c in sorted(subs, key=lambda sub: -sub[0]))
 
 # The exception classes from the notes.
 class GroveException(Exception): pass
@@ -18,6 +71,7 @@ class GroveEvalException(GroveException): pass
 
 # Command Base Class (superclass of expressions and statements)
 class Command(object):
+    __slots__ = ()
     @abstractmethod
     def __init__(self): pass
     @abstractmethod
@@ -27,23 +81,34 @@ class Command(object):
         """Factory method for creating Command subclasses from lines of code"""
         # the command should split the input into tokens based on whitespace
         tokens: list[str] = s.strip().split()
-        # a command must be either a statement or an expression
-        try:
-            # first try to parse the command as a statement
-            stmt = Statement.parse(tokens)
-            return stmt
-        except GroveParseException as e:
-            if verbose: print(e)
+        if not tokens: raise GroveParseException("Empty Command")
+        # a registered keyword decides whether this is a statement or an
+        # expression; otherwise try any statements without one, then expressions
+        t0: str = tokens[0]
+        # parse results are only memoized while this command is parsed
+        global _parse_cache
+        _parse_cache = {}
         try:
-            # if it is not a statement, try an expression
-            expr = Expression.parse(tokens)
-            return expr
+            sub = _STMT_DISPATCH.get(t0) or _EXPR_DISPATCH.get(t0)
+            if sub is not None: return sub.parse(tokens)
+            if Statement._ordered:
+                try:
+                    return Statement.parse(tokens)
+                except GroveParseException as e:
+                    if verbose: print(e)
+            return Expression.parse(tokens)
         except GroveParseException as e:
             if verbose: print(e)
+        finally:
+            _parse_cache = None
         raise GroveParseException(f"Unrecognized Command: {s}")
 
 # Expression Base Class (superclass of Num, Name, StringLiteral, etc.)
 class Expression(Command):
+    __slots__ = ()
+    # registered subclasses without a keyword in priority order, kept up to
+    # date by register_expression
+    _ordered: ClassVar[tuple[type[Expression], ...]] = ()
     @abstractmethod
     def __init__(self): pass
     @abstractmethod
@@ -51,10 +116,38 @@ class Expression(Command):
     @classmethod
     def parse(cls, tokens: list[str]) -> Expression:
         """Factory method for creating Expression subclasses from tokens"""
-        # get a list of all the subclasses of Expression
-        subclasses: list[type[Expression]] = cls.__subclasses__()
-        # try each subclass in turn to see if it matches the pattern
-        for subclass in subclasses:
+        # while a command is parsed each span of several tokens is parsed at
+        # most once, whether the attempt succeeded or raised; single tokens
+        # are cheaper to parse again than to look up
+        if _parse_cache is None or len(tokens) < 2: return cls._parse(tokens)
+        key = (cls, tuple(tokens))
+        result = _parse_cache.get(key)
+        if result is None:
+            try: result = cls._parse(tokens)
+            except GroveParseException as e: result = e
+            _parse_cache[key] = result
+        if isinstance(result, GroveParseException):
+            raise result.with_traceback(None)
+        return result
+    @classmethod
+    def _parse(cls, tokens: list[str]) -> Expression:
+        if not tokens: raise GroveParseException("Empty Expression")
+        # the first token alone decides which subclass can parse these tokens
+        t0: str = tokens[0]
+        sub = _EXPR_DISPATCH.get(t0)
+        if sub is not None: return sub.parse(tokens)
+        # literals have no alternative parse, so only a malformed one raises
+        kind = token_kind(t0) if len(tokens) == 1 else None
+        if kind == 'STR': return StringLiteral._shared(t0)
+        if kind == 'NUM': return Number._shared(int(t0))
+        if kind == 'NAME' and t0 not in protected_names: return Name(t0)
+        if t0[:1] == '"': return StringLiteral.parse(tokens)
+        if t0[:1].isdigit(): return Number.parse(tokens)
+        # otherwise try the registered subclasses without a keyword in turn,
+        # skipping any whose can_parse already rules the tokens out
+        for subclass in cls._ordered:
+            can_parse = getattr(subclass, 'can_parse', None)
+            if can_parse is not None and not can_parse(tokens): continue
             try: 
                 return subclass.parse(tokens)
             except GroveParseException as e:
@@ -62,20 +155,29 @@ class Expression(Command):
         # if none of the subclasses parsed successfully raise an exception
         raise GroveParseException(f"Unrecognized Expression: {' '.join(tokens)}")
     @staticmethod
-    def match_parens(tokens: list[str]) -> int:
-        """Searches tokens beginning with ( and returns index of matching )"""
+    def match_parens(tokens: list[str], start: int = 0) -> int:
+        """Searches tokens beginning with ( at start and returns index of matching )"""
         # ensure tokens is such that a matching ) might exist
-        if len(tokens) < 2: raise GroveParseException("Expression too short")
-        if tokens[0] != '(': raise GroveParseException("No opening ( found")
+        if len(tokens) - start < 2: raise GroveParseException("Expression too short")
+        if tokens[start] != '(': raise GroveParseException("No opening ( found")
+        # list.index jumps straight to the next paren, skipping other tokens
+        end: int = len(tokens)
+        def find(paren: str, pos: int) -> int:
+            try: return tokens.index(paren, pos)
+            except ValueError: return end
         # track the depth of nested ()
-        depth: int = 0
-        for i,token in enumerate(tokens):
-            # when a ( is found, increase the depth
-            if token == '(': depth += 1
-            # when a ) is found, decrease the depth
-            elif token == ')': depth -= 1
-            # if after a token the depth reaches 0, return that index
-            if depth == 0: return i
+        depth: int = 1
+        next_open: int = find('(', start + 1)
+        next_close: int = find(')', start + 1)
+        while next_close != end:
+            # every ( before the next ) opens a deeper level
+            while next_open < next_close:
+                depth += 1
+                next_open = find('(', next_open + 1)
+            depth -= 1
+            # if after a ) the depth reaches 0, return that index
+            if depth == 0: return next_close
+            next_close = find(')', next_close + 1)
         # if the depth never again reached 0 then parens do not match
         raise GroveParseException("No closing ) found")
      
@@ -83,15 +185,21 @@ class Expression(Command):
 
 # Statement Base Class (superclass of Assign, Terminate, and Import)
 class Statement(Command):
+    __slots__ = ()
+    # registered subclasses without a keyword in priority order, kept up to
+    # date by register_statement
+    _ordered: ClassVar[tuple[type[Statement], ...]] = ()
     @abstractmethod
     def __init__(self): pass
     @abstractmethod
     def eval(self) -> None: pass
     @classmethod
-    def parse(cls, tokens: list[str]):
+    def parse(cls, tokens: list[str]) -> Statement:
         """Factory method for creating Statement subclasses from methods"""
-        subclasses: list[type[Statement]] = cls.__subclasses__()
-        for subclass in subclasses:
+        # every statement begins with its keyword
+        sub = _STMT_DISPATCH.get(tokens[0]) if tokens else None
+        if sub is not None: return sub.parse(tokens)
+        for subclass in cls._ordered:
             try:
                 return subclass.parse(tokens)
             except GroveParseException as e:
@@ -104,13 +212,24 @@ class Statement(Command):
 # Implement each of the following parse tree nodes for the Grove language
 # -----------------------------------------------------------------------------
 
+@register_expression(5)
+@dataclass(frozen=True)
 class Number(Expression):
-    def __init__(self, num: int):
-        self.num = num
+    __slots__ = ('num',)
+    num: int
     def eval(self) -> int:
         return self.num
-    def __eq__(self, other: Any) -> bool:
-        return (isinstance(other, Number) and other.num == self.num)
+    @staticmethod
+    def _shared(num: int) -> Number:
+        """Returns the single Number node the parser uses for a small num"""
+        if not -128 <= num <= 256: return Number(num)
+        node = _NUM_CACHE.get(num)
+        if node is None: node = _NUM_CACHE[num] = Number(num)
+        return node
+    @staticmethod
+    def can_parse(tokens: list[str]) -> bool:
+        """Checks whether tokens form a Number without raising"""
+        return len(tokens) == 1 and token_kind(tokens[0]) == 'NUM'
     @staticmethod
     def parse(tokens: list[str]) -> Number:
         """Factory method for creating Number expressions from tokens"""
@@ -118,18 +237,27 @@ class Number(Expression):
         if len(tokens) != 1:
             raise GroveParseException("Wrong number of tokens for Number")
         # 1. ensure that all characters in that token are digits
-        if not tokens[0].isdigit():
+        if token_kind(tokens[0]) != 'NUM':
             raise GroveParseException("Numbers can only contain digits")
         # if this point is reached, this is a valid Number expression
-        return Number(int(tokens[0]))
+        return Number._shared(int(tokens[0]))
 
+@register_expression(5)
+@dataclass(frozen=True)
 class StringLiteral(Expression):
-    def __init__(self, string: str):
-        self.string = string
+    __slots__ = ('string',)
+    string: str
     def eval(self) -> str:
         return self.string
-    def __eq__(self, other: Any) -> bool:
-        return (isinstance(other, StringLiteral) and other.string == self.string)
+    @staticmethod
+    def _shared(string: str) -> StringLiteral:
+        """Returns the single StringLiteral node the parser uses for a short string"""
+        if len(string) > 32: return StringLiteral(string)
+        return _STR_CACHE(string)
+    @staticmethod
+    def can_parse(tokens: list[str]) -> bool:
+        """Checks whether tokens form a StringLiteral without raising"""
+        return len(tokens) == 1 and token_kind(tokens[0]) == 'STR'
     @staticmethod
     def parse(tokens: list[str]) -> StringLiteral:
         """Factory method for creating StringLiteral expressions from tokens"""
@@ -137,77 +265,112 @@ class StringLiteral(Expression):
         if len(tokens) != 1:
             raise GroveParseException("Wrong number of tokens for StringLiteral")
         # 2. Ensure StringLiteral begins and ends with quotation marks
-        if tokens[0][0] != '"' or tokens[0][tokens[0].__len__()] != '"':
+        if len(tokens[0]) < 2 or tokens[0][0] != '"' or tokens[0][-1] != '"':
             raise GroveParseException("StringLiteral does not begin and end with quotations")
         # 3. Ensure StringLiteral does not contain any extra quotations or whitespace
         if '"' in tokens[0][1:-1] or any(c.isspace() for c in tokens[0]):
             raise GroveParseException("Illegal character in StringLiteral")
-        return StringLiteral(str(tokens[0]))
+        return StringLiteral._shared(str(tokens[0]))
 
+@register_expression(10, ('new',))
+@dataclass(frozen=True)
 class Object(Expression):
-    def __init__(self, names: list[Name]):
-        self.names = names
-    def eval(self):
+    __slots__ = ('names', '_getter')
+    # a tuple so that the frozen node can be hashed
+    names: tuple[Name, ...]
+    def __post_init__(self) -> None:
+        # the lookup of every name after the first, built once for all evals
+        getter = attrgetter('.'.join(n.name for n in self.names[1:])) if len(self.names) > 1 else None
+        object.__setattr__(self, '_getter', getter)
+    def _path(self) -> str:
+        """Joins the names back into the dotted path, for error messages"""
+        return '.'.join(n.name for n in self.names)
+    def eval(self) -> object:
+        # imported modules live in context; builtins are found in globals
+        head: str = self.names[0].name
+        if head in context: root = context[head]
+        elif head == '__builtins__': root = builtins
+        elif head in globals(): root = globals()[head]
+        else: raise GroveEvalException(f"{head} has not been imported yet.")
         try:
-            objectModule = globals()[self.names[0].name]
-        except KeyError:
-            raise GroveEvalException(f"{self.names[0].name} has not been imported yet.")
-        names = [n.name for n in self.names[1:]]
-        for n in names:
-            if (not n in dir(objectModule)):
-                raise GroveEvalException(f"{n} in {'.'.join(names)} has not been imported yet.")
-            objectModule = getattr(objectModule, n)
-        if (type(objectModule) != type):
-            raise GroveEvalException(f"{'.'.join(names)} is not a type")
+            objectType = self._getter(root) if self._getter is not None else root
+        except AttributeError:
+            raise GroveEvalException(f"{self._path()} has not been imported yet.")
+        if not isinstance(objectType, type):
+            raise GroveEvalException(f"{self._path()} is not a type")
         try:
-            return objectModule()
+            return objectType()
         except Exception as e:
-            raise GroveEvalException(f"could not initiate {'.'.join(names)}.\n{e}.")
+            raise GroveEvalException(f"could not initiate {self._path()}.\n{e}.")
     @staticmethod
-    def parse(tokens: list[str]):
+    def parse(tokens: list[str]) -> Object:
         if (len(tokens) != 2):
             raise GroveParseException(f"{' '.join(tokens)} does not contain the correct number of tokens for an object.")
         if (tokens[0] != 'new'):
             raise GroveParseException("An object must begin with 'new'.")
-        nameStrings = filter(lambda x: len(x) > 0, tokens[1].split('.'))
-        if len(nameStrings) < 1:
+        nameStrings = [ns for ns in tokens[1].split('.') if ns]
+        if not nameStrings:
             raise GroveParseException(f"{tokens[1]} must contain at least one name")
         try:
-            names = [Name.parse(ns) for ns in nameStrings]
+            names = tuple(Name.parse([ns]) for ns in nameStrings)
         except GroveParseException:
             raise GroveParseException(f"{tokens[1]} must be a list of names separated by '.'")
         return Object(names)
   
+@register_expression(10, ('call',))
+@dataclass
 class Call(Expression):
-    def __init__(self, obj: Name, met: Name, expr: list[Expression]):
-        self.obj: Name = obj
-        self.met: Name = met
-        self.expr: list[Expression] = expr
-    def eval(self):
-        if self.obj.name not in context:
-            raise GroveEvalException(f"Specified object {self.obj} does not exist")
-        obj = context[self.obj.name]
-        if (not any(mn == self.met.name for mn in dir(obj))):
-            raise GroveEvalException(f"The object {self.obj.name} does not have a method named {self.met.name}.")
-        if (not callable(getattr(obj, self.met.name))):
-            raise GroveEvalException(f"The object {self.obj.name}'s attribute {self.met.name} is not callable.")
-        values = [e.eval() for e in self.expr]
+    __slots__ = ('obj', 'met', 'expr', '_bound', '_arg_evals', '_const_values')
+    obj: Name
+    met: Name
+    expr: list[Expression]
+    def __post_init__(self) -> None:
+        # the eval of each argument, or the argument values themselves when
+        # every argument is a literal
+        self._arg_evals: tuple[Callable[[], Any], ...] = tuple(e.eval for e in self.expr)
+        self._const_values: Union[tuple[Any, ...], None] = None
+        if all(type(e) is Number or type(e) is StringLiteral for e in self.expr):
+            self._const_values = tuple(f() for f in self._arg_evals)
+        # the object and bound method found when this call last ran
+        self._bound: Union[tuple[object, Any], None] = None
+    def eval(self) -> object:
         try:
-            res = getattr(obj, self.met.name)(*values)
+            obj = context[self.obj.name]
+        except KeyError:
+            raise GroveEvalException(f"Specified object {self.obj.name} does not exist")
+        if self._bound is not None and self._bound[0] is obj:
+            method = self._bound[1]
+        else:
+            try:
+                method = getattr(obj, self.met.name)
+            except AttributeError:
+                raise GroveEvalException(f"The object {self.obj.name} does not have a method named {self.met.name}.")
+            if (not callable(method)):
+                raise GroveEvalException(f"The object {self.obj.name}'s attribute {self.met.name} is not callable.")
+            self._bound = (obj, method)
+        values: Sequence[Any]
+        if self._const_values is not None:
+            values = self._const_values
+        else:
+            values = [f() for f in self._arg_evals]
+        try:
+            res = method(*values)
         except TypeError as e:
             raise GroveEvalException(f"The object {self.obj.name}'s method {self.met.name} was called incorrectly.\n{e}")
         except Exception as e:
             raise GroveEvalException(f"An error occured while evaluating {self.obj.name}'s method {self.met.name}.\n{e}")
         return res
     @staticmethod
-    def parse(tokens: list[str]) -> Expression:
+    def parse(tokens: list[str]) -> Call:
         if (len(tokens) < 5):
             raise GroveParseException(f"{' '.join(tokens)} does not have enough tokens for a call statement.")
         if (tokens[0] != 'call'):
             raise GroveParseException(f"{' '.join(tokens)} does not begin with 'call'.")
-        closingparens = Expression.match_parens(tokens[2:]) + 2
-        if (closingparens < 5):
+        closingparens = Expression.match_parens(tokens, 1)
+        if (closingparens < 4):
             raise GroveParseException(f"{' '.join(tokens)} does not have enough tokens for a call statement between parantheses.")
+        if (closingparens != len(tokens) - 1):
+            raise GroveParseException(f"Unexpected tokens after call statement: {' '.join(tokens[closingparens + 1:])}")
         try:
             obj = Name.parse([tokens[2]])
         except:
@@ -218,51 +381,76 @@ class Call(Expression):
             raise GroveParseException("No method name found for Call expression")
         expr: list[Expression] = list()
         start = 4
-        for i in [i + start + 1 for i in range(closingparens - start)]:
+        while start < closingparens:
+            arg, start = Call._parse_arg(tokens, start, closingparens)
+            expr.append(arg)
+        return Call(obj, met, expr)
+    @staticmethod
+    def _parse_arg(tokens: list[str], i: int, end: int) -> tuple[Expression, int]:
+        """Parses the argument starting at tokens[i] (before end) into (node, next index)"""
+        t: str = tokens[i]
+        # literals, names, calls and objects are recognized by their first token
+        kind = token_kind(t)
+        if kind == 'NUM': return Number._shared(int(t)), i+1
+        if kind == 'STR': return StringLiteral._shared(t), i+1
+        if kind == 'NAME' and t not in protected_names: return Name(t), i+1
+        if t == 'call':
+            closing = Expression.match_parens(tokens, i+1)
+            return Call.parse(tokens[i:closing+1]), closing+1
+        if t == 'new': return Object.parse(tokens[i:i+2]), i+2
+        # any other argument is the shortest run of tokens that parses; a
+        # failed attempt is memoized so no span is tried twice
+        for j in range(i+1, end+1):
             try:
-                expr.append(Expression.parse(tokens[start:i]))
-                start = i
+                return Expression.parse(tokens[i:j]), j
             except GroveParseException:
                 continue
-        return Call(obj, met, expr)
+        raise GroveParseException(f"Invalid argument for Call expression: {' '.join(tokens[i:end])}")
         
 class Addition(Expression):
-    #TODO: Implement node for + statements   
+    #TODO: Implement node for + statements, then add @register_expression(5)
     pass
 
 
+@register_expression(0)
+@dataclass(frozen=True, eq=False)
 class Name(Expression):
-    def __init__(self, name: str):
-        self.name = name
+    __slots__ = ('name',)
+    name: str
+    def __post_init__(self) -> None:
+        # interned so that equal names are the same string object
+        object.__setattr__(self, 'name', sys.intern(self.name))
     def eval(self) -> object:
         try: return context[self.name]
         except KeyError: raise GroveEvalException(f"{self.name} is undefined")
     def __eq__(self, other: Any) -> bool:
-        return isinstance(other, Name) and self.name == other.name
+        return type(other) is Name and self.name is other.name
+    def __hash__(self) -> int:
+        return hash(self.name)
+    @staticmethod
+    def can_parse(tokens: list[str]) -> bool:
+        """Checks whether tokens form a Name without raising"""
+        return (len(tokens) == 1 and token_kind(tokens[0]) == 'NAME' and
+                tokens[0] not in protected_names)
     @staticmethod
     def parse(tokens: list[str]) -> Name:
         """Factory method for creating Name expressions from tokens"""
         if len(tokens) != 1:
             raise GroveParseException("Wrong number of tokens for Name")
-        if not tokens[0].replace('_', 'a').isalnum():
-            raise GroveParseException("Name must contain only alphanumeric characters")
-        if not tokens[0][0].isalpha or tokens[0][0] == '_':
-            raise GroveParseException("Name must start with an alphabetic character (or _)")
+        if token_kind(tokens[0]) != 'NAME':
+            raise GroveParseException("Name must start with an alphabetic character (or _) and contain only alphanumeric characters")
         if tokens[0] in protected_names:
             raise GroveParseException(f"Name {tokens[0]} is a reserved word")
         return Name(tokens[0])
 
+@register_statement(10, ('set',))
+@dataclass(frozen=True)
 class Assignment(Statement):
-    def __init__(self, name: Name, value: Expression):
-        self.name = name
-        self.value = value
+    __slots__ = ('name', 'value')
+    name: Name
+    value: Expression
     def eval(self) -> None:
-        value = self.value.eval()
-        context[self.name.name] = (type(value), value)
-    def __eq__(self, other: Any):
-        return (isinstance(other, Assignment) and
-        self.name == other.name and
-        self.value == other.value)
+        context[self.name.name] = self.value.eval()
     @staticmethod
     def parse(tokens: list[str]) -> Assignment:
         """Factory method for creating Assignment commands from tokens"""
@@ -289,19 +477,23 @@ class Assignment(Statement):
         # if this point is reached, this is a valid Set statement
         return Assignment(name, value)
 
+@register_statement(10, ('import',))
+@dataclass(frozen=True)
 class Import(Statement):
-    def __init__(self, names: list[Name]):
-        self.names  = names
+    __slots__ = ('names',)
+    # a tuple so that the frozen node can be hashed
+    names: tuple[Name, ...]
     def eval(self) -> None:
         nameString = '.'.join([name.name for name in self.names])
-        if nameString not in context:
+        # modules that are already loaded need no trip through the import system
+        module = sys.modules.get(nameString)
+        if module is None:
             try:
                 module = importlib.import_module(nameString)
-            except:
-                raise GroveEvalException("Module could not be imported")
+            except Exception as e:
+                raise GroveEvalException(f"Module {nameString} could not be imported: {e}")
         context[nameString] = module
-    def __eq__(self, other: Any):
-        return (isinstance(other, Import) and self.names == other.names)
+    @staticmethod
     def parse(tokens: list[str]) -> Import:
         if len(tokens) < 2:
             raise GroveParseException("Not enough tokens for Import Statement")
@@ -309,29 +501,43 @@ class Import(Statement):
             raise GroveParseException("Import statements must begin with \"import\"")
         names: list[Name] = []
         try:
-            names.append(Name.parse(tokens[1]))
+            names.append(Name.parse([tokens[1]]))
         except:
             raise GroveParseException(f"{tokens[1]} is not a valid Name")
         i = 2
         while(i < len(tokens)):
-            if tokens[i] != '.':
+            if tokens[i] != '.' or i + 1 == len(tokens):
                 raise GroveParseException("Invalid format for Import Statement")
             try:
-                names.append(Name.parse(tokens[i+1]))
+                names.append(Name.parse([tokens[i+1]]))
             except:
                 raise GroveParseException(f"{tokens[i+1]} is not a valid Name")
             i += 2
-        return Import(names)    
+        return Import(tuple(names))    
 
+@register_statement(10, ('quit', 'exit'))
+@dataclass(frozen=True)
 class Terminate(Statement):
-    def __init__(self):
-        pass
+    __slots__ = ()
     def eval(self) -> None:
         sys.exit()
     @staticmethod
-    def parse(tokens) -> Terminate:
+    def parse(tokens: list[str]) -> Terminate:
         if len(tokens) != 1:
             raise GroveParseException("Wrong number of tokens for terminate")
         if tokens[0] != "quit" and tokens[0] != "exit":
             raise GroveParseException("Terminate statements must be either \"quit\" or \"set\"")
-        return Terminate()
+        return TERMINATE
+
+# Terminate holds no state so every quit or exit parses to this one node
+TERMINATE = Terminate()
+
+# small literals hold no state beyond their token so parsed ones are shared
+_NUM_CACHE: dict[int, Number] = {}
+# a program can use any number of distinct strings, so only the most
+# recently parsed ones are kept
+_STR_CACHE: Callable[[str], StringLiteral] = lru_cache(maxsize=1024)(StringLiteral)
+
+# memoized Expression.parse results (or exceptions) for the command that
+# Command.parse is parsing, None outside of it
+_parse_cache: Union[dict[tuple[type, tuple[str, ...]], Union[Expression, GroveParseException]], None] = None
@@ -0,0 +1,142 @@
+from __future__ import annotations
+import unittest
+
+# identify the current directory of this script and add it to the path
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+# import all node types from the grove language
+from dataclasses import dataclass
+import grove_lang
+from grove_lang import *
+
+class TestGroveParsing(unittest.TestCase):
+
+    def test_name(self):
+        # names may start with _ and contain digits after the first character
+        for token in ["x", "_a", "a1", "snake_case_2", "__builtins__"]:
+            self.assertTrue(Name.can_parse([token]))
+            self.assertEqual(Command.parse(token), Name(token))
+
+    def test_name_errors(self):
+        for token in ["1a", "a-b", "a.b", "é", "set", "call"]:
+            self.assertFalse(Name.can_parse([token]))
+            with self.assertRaises(GroveParseException):
+                Name.parse([token])
+
+    def test_string_literal(self):
+        # the empty string is a valid literal
+        self.assertTrue(StringLiteral.can_parse(['""']))
+        self.assertEqual(Command.parse('""'), StringLiteral('""'))
+        self.assertEqual(Command.parse('"hi"'), StringLiteral('"hi"'))
+
+    def test_string_literal_errors(self):
+        # a lone " once raised IndexError instead of a parse error
+        for token in ['"', '"a b"', '"a"b"', 'a"']:
+            self.assertFalse(StringLiteral.can_parse([token]))
+            with self.assertRaises(GroveParseException):
+                StringLiteral.parse([token])
+        with self.assertRaises(GroveParseException):
+            Command.parse('"')
+
+    def test_import(self):
+        cmd: Command = Command.parse("import os")
+        self.assertEqual(cmd, Import((Name("os"),)))
+        # names longer than one character were once rejected
+        cmd = Command.parse("import collections . abc")
+        self.assertEqual(cmd, Import((Name("collections"), Name("abc"))))
+
+    def test_import_errors(self):
+        for line in ["import", "import os .", "import os abc", "import . os", "import os . 1a"]:
+            with self.assertRaises(GroveParseException):
+                Command.parse(line)
+
+    def test_object(self):
+        cmd: Command = Command.parse("new a.b")
+        self.assertEqual(cmd, Object((Name("a"), Name("b"))))
+        self.assertEqual(Command.parse("new list"), Object((Name("list"),)))
+        # empty parts of the path are dropped, as the grammar always did
+        self.assertEqual(Command.parse("new a..b"), cmd)
+
+    def test_object_errors(self):
+        for line in ["new", "new 1a", "new a.1b", "new .", "new a b", "new a.set"]:
+            with self.assertRaises(GroveParseException):
+                Command.parse(line)
+
+    def test_hashable(self):
+        # frozen nodes can be hashed, so equal parses can share dict entries
+        for line in ["import os . path", "new collections.OrderedDict", "5", '"s"', "x"]:
+            self.assertEqual(hash(Command.parse(line)), hash(Command.parse(line)))
+        memo: dict[Command, int] = {Command.parse("import os"): 1}
+        self.assertEqual(memo[Command.parse("import os")], 1)
+
+    def test_register_after_import(self):
+        # a subclass registered after import is tried in priority order
+        @register_expression(7)
+        @dataclass(frozen=True)
+        class Negate(Expression):
+            __slots__ = ('value',)
+            value: Expression
+            def eval(self) -> object: return -self.value.eval()
+            @staticmethod
+            def parse(tokens: list[str]) -> Negate:
+                if len(tokens) < 2 or tokens[0] != '~':
+                    raise GroveParseException("Negate must begin with ~")
+                return Negate(Expression.parse(tokens[1:]))
+        self.addCleanup(unregister_expression, Negate)
+        self.assertEqual(Expression._ordered, (Negate, Number, StringLiteral, Name))
+        self.assertEqual(Command.parse("~ 5"), Negate(Number(5)))
+        self.assertEqual(Command.parse("~ 5").eval(), -5)
+        # and a keyword sends the command straight to its class
+        @register_statement(keywords=('show',))
+        @dataclass(frozen=True)
+        class Show(Statement):
+            __slots__ = ('value',)
+            value: Expression
+            def eval(self) -> None: pass
+            @staticmethod
+            def parse(tokens: list[str]) -> Show:
+                return Show(Expression.parse(tokens[1:]))
+        self.addCleanup(unregister_statement, Show)
+        self.assertEqual(Command.parse("show ~ 5"), Show(Negate(Number(5))))
+        # once removed neither is parsed any more
+        unregister_expression(Negate)
+        unregister_statement(Show)
+        self.assertEqual(Expression._ordered, (Number, StringLiteral, Name))
+        for line in ["~ 5", "show 5"]:
+            with self.assertRaises(GroveParseException):
+                Command.parse(line)
+
+    def test_call_no_args(self):
+        cmd: Command = Call.parse("call ( s upper )".split())
+        self.assertEqual(cmd, Call(Name("s"), Name("upper"), []))
+
+    def test_call_literal_args(self):
+        cmd: Command = Call.parse('call ( s find "e" 5 x )'.split())
+        self.assertEqual(cmd, Call(Name("s"), Name("find"),
+                                   [StringLiteral('"e"'), Number(5), Name("x")]))
+
+    def test_call_nested_args(self):
+        # arguments made of several tokens end where their own parens close
+        cmd: Command = Call.parse('call ( s get call ( t find "A" ) new collections.OrderedDict 7 )'.split())
+        self.assertEqual(cmd, Call(Name("s"), Name("get"), [
+            Call(Name("t"), Name("find"), [StringLiteral('"A"')]),
+            Object((Name("collections"), Name("OrderedDict"))),
+            Number(7)]))
+
+    def test_call_errors(self):
+        for line in ["call ( s )", "call ( s find 5 ) 7", "call s find 5",
+                     "call ( s find set x = 3 )", "call ( s find ( 5 )"]:
+            with self.assertRaises(GroveParseException):
+                Call.parse(line.split())
+
+    def test_parse_cache_scope(self):
+        # parse results are only kept while Command.parse parses a command,
+        # so parsing expressions directly does not accumulate them
+        Expression.parse('call ( s find "e" )'.split())
+        self.assertIsNone(grove_lang._parse_cache)
+        Command.parse('set y = call ( s find "e" )')
+        self.assertIsNone(grove_lang._parse_cache)
+
+if __name__=='__main__': unittest.main()
@@ -0,0 +1,26 @@
+# Optional native build of the Grove language. Running
+#     python setup.py build_ext --inplace
+# compiles grove_lang.py with Cython into an extension module that Python
+# imports in place of the source. Without it the pure Python module is used.
+#
+# GROVE_CYTHON controls the build: unset builds the extension only when
+# Cython is installed, True requires it, and False skips it.
+import os
+from setuptools import setup
+
+use_cython = os.environ.get("GROVE_CYTHON", "").strip().lower()
+ext_modules = []
+if use_cython not in ("false", "0", "no"):
+    try:
+        from Cython.Build import cythonize
+    except ImportError:
+        if use_cython in ("true", "1", "yes"):
+            raise
+    else:
+        ext_modules = cythonize(["grove_lang.py"], language_level=3)
+
+setup(
+    name="grove_lang",
+    py_modules=["grove_lang"],
+    ext_modules=ext_modules,
+)
@@ -60,6 +60,9 @@ def check_bad_last_eval(filename):
              
              
 if __name__ == "__main__":
+    # the parser is plain Python, so a JIT-capable runtime speeds it up unchanged
+    if sys.implementation.name == 'cpython' and sys.version_info < (3, 13):
+        print("Tip: run under pypy3 or a JIT-enabled python3.13 (PYTHON_JIT=1) for a faster parser", file=sys.stderr)
     totalPoints = 0
     
     print("Checking that parsing errors are caught...")